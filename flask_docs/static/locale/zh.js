@@ -1 +1 @@
-const zhLocale={"Welcome to":"欢迎使用","Please enter the original password for $API_DOC_PASSWORD_SHA2":"请输入 $API_DOC_PASSWORD_SHA2 的原始密码，具体请参考配置项","PASSWORD":"密码","LOGIN":"登录","Unauthorized":"未授权","Incorrect password":"密码错误","Filter Keyword":"输入关键字进行过滤","Request":"请求","Select":"请选择","Input":"请输入","Send":"发送","Headers":"头字段","Name":"名称","Value":"值","Add":"添加","Body":"正文","Request Body":"请求正文内容","The request body is not json":"请求正文非 json 格式","Response":"响应","Preview":"预览","Success":"成功","Warning":"警告","Error":"异常","Copied":"已复制"}
\ No newline at end of file
+const zhLocale={"Welcome to":"欢迎使用","Please enter the original password for $API_DOC_PASSWORD_SHA2":"请输入 $API_DOC_PASSWORD_SHA2 的原始密码，具体请参考配置项","PASSWORD":"密码","LOGIN":"登录","Unauthorized":"未授权","Incorrect password":"密码错误","Filter Keyword":"输入关键字进行过滤","Request":"请求","Select":"请选择","Input":"请输入","Send":"发送","Headers":"头字段","Name":"名称","Value":"值","Add":"添加","Body":"正文","Request Body":"请求正文内容","The request body is not json":"请求正文非 json 格式","Response":"响应","Preview":"预览","Success":"成功","Warning":"警告","Error":"异常","Copied":"已复制","The browser cannot decompress the shards, export them with --shard but without --gzip":"浏览器无法解压分片，请仅使用 --shard 而不使用 --gzip 导出"}
\ No newline at end of file
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Program:
+    Benchmark docs collection scaling
+Version:
+    0.0.1
+History:
+    Created on 2026/10/17
+    Last modified on 2026/10/17
+Author:
+    kwkw
+Usage:
+    python -m tests.benchmark.collection [ROUTES ...]
+"""
+
+import sys
+import time
+
+from flask import Blueprint, Flask
+
+from flask_docs import ApiDoc
+
+ROUTES = [100, 1000, 10000, 50000]
+
+
+def make_app(routes, blueprints=10):
+    """Every view is registered twice, so half of the rules are merged"""
+
+    app = Flask(__name__)
+    app.config["API_DOC_MEMBER"] = ["bp{}".format(i) for i in range(blueprints)]
+    apidoc = ApiDoc(app)
+
+    bps = [Blueprint("bp{}".format(i), __name__) for i in range(blueprints)]
+    for i in range(routes // 2):
+        bp = bps[i % blueprints]
+
+        def view():
+            pass
+
+        view.__name__ = "view_{}".format(i)
+        view.__doc__ = "View {}\n\n    @@@\n    ### return\n    ok\n    @@@\n".format(i)
+        bp.add_url_rule("/view_{}".format(i), view_func=view, methods=["GET", "POST"])
+        bp.add_url_rule("/view_{}/alias".format(i), view_func=view, methods=["PUT"])
+
+    for bp in bps:
+        app.register_blueprint(bp, url_prefix="/" + bp.name)
+
+    return app, apidoc
+
+
+def measure(routes):
+    app, apidoc = make_app(routes)
+    with app.app_context():
+        start = time.perf_counter()
+        apidoc._get_data_dict()
+        return time.perf_counter() - start
+
+
+def main(routes_list):
+    print("{:>8} {:>10} {:>12}".format("routes", "seconds", "us/route"))
+    for routes in routes_list:
+        seconds = measure(routes)
+        print(
+            "{:>8} {:>10.3f} {:>12.1f}".format(
+                routes, seconds, seconds / routes * 1000000
+            )
+        )
+
+
+if __name__ == "__main__":
+    main([int(r) for r in sys.argv[1:]] or ROUTES)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Program:
+    Benchmark import time, against a baseline
+Version:
+    0.0.1
+History:
+    Created on 2026/10/17
+    Last modified on 2026/10/17
+Author:
+    kwkw
+Usage:
+    python -m tests.benchmark.importtime [RUNS] [--save] [--threshold 0.5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from tests.benchmark.suite import BASELINE_PATH, load_baseline, save_baseline
+
+RUNS = 5
+THRESHOLD = 0.5
+# Microseconds below which a difference is noise whatever the ratio
+NOISE_US = 1000
+
+
+def import_time(module="flask_docs", env=None):
+    """Self and cumulative microseconds of `module` from `python -X importtime`
+
+    Flask is imported first, the app imports it anyway.
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import flask, " + module],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        env=env,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[0].split()[-1]), int(fields[1])
+
+    raise ValueError("{} not in importtime output".format(module))
+
+
+def measure(runs=RUNS):
+    """Best of `runs`, with the bytecode cached beforehand"""
+
+    with tempfile.TemporaryDirectory() as pycache:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        import_time(env=env)
+        return min(import_time(env=env) for _ in range(runs))
+
+
+def is_regression(cumulative_us, baseline, threshold=THRESHOLD):
+    """Whether the cumulative time is more than `threshold` over the baseline"""
+
+    base = baseline.get("import", {}).get("cumulative_us")
+    if base is None:
+        return False
+
+    return cumulative_us > max(base * (1 + threshold), base + NOISE_US)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmark.importtime")
+    parser.add_argument("runs", nargs="?", type=int, default=RUNS, metavar="RUNS")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="Save as the baseline")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    self_us, cumulative_us = measure(args.runs)
+    base = baseline.get("import", {}).get("cumulative_us")
+    print("{:>12} {:>16} {:>12}".format("self us", "cumulative us", "baseline"))
+    print(
+        "{:>12} {:>16} {:>12}".format(
+            self_us, cumulative_us, "-" if base is None else base
+        )
+    )
+
+    if args.save:
+        save_baseline(
+            {"import": {"self_us": self_us, "cumulative_us": cumulative_us}},
+            args.baseline,
+        )
+        return 0
+
+    if is_regression(cumulative_us, baseline, args.threshold):
+        print(
+            "Regression: cumulative {} -> {} us, over {:.0%}".format(
+                base, cumulative_us, args.threshold
+            )
+        )
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Program:
+    Benchmark docs collection and export on synthetic apps, against a baseline
+Version:
+    0.0.1
+History:
+    Created on 2026/10/17
+    Last modified on 2026/10/17
+Author:
+    kwkw
+Usage:
+    python -m tests.benchmark.suite [SCALE ...] [--save] [--threshold 0.5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from flask_docs import SOURCE_INDEX, ApiDoc
+from tests.benchmark.synthetic import synthetic_app
+
+SCALES = {
+    "small": dict(
+        blueprints=2,
+        views=10,
+        method_views=2,
+        resources=2,
+        restx_resources=2,
+        arguments=3,
+    ),
+    "medium": dict(
+        blueprints=10,
+        views=50,
+        method_views=10,
+        resources=10,
+        restx_resources=10,
+        arguments=5,
+    ),
+    "large": dict(
+        blueprints=20,
+        views=200,
+        method_views=20,
+        resources=20,
+        restx_resources=20,
+        arguments=5,
+    ),
+}
+
+# Seconds and milliseconds, lower is better
+METRICS = (
+    "collect_s",
+    "data_cold_ms",
+    "data_warm_ms",
+    "html_s",
+    "markdown_s",
+    "collect_peak_mb",
+    "html_peak_mb",
+    "markdown_peak_mb",
+)
+
+# Timings depend on the machine, save a baseline before comparing
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+THRESHOLD = 0.5
+# Differences below these are noise whatever the ratio, by unit
+NOISE = {"s": 0.01, "ms": 1.0, "mb": 0.5}
+REPEAT = 3
+
+
+def best_time(func, repeat=REPEAT):
+    """Best seconds of `repeat` cold runs"""
+
+    seconds = []
+    for _ in range(repeat):
+        SOURCE_INDEX.clear()
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+
+    return min(seconds)
+
+
+def peak_memory(func):
+    """Peak MB allocated by a cold run, traced apart from the timed runs"""
+
+    SOURCE_INDEX.clear()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def measure(scale, repeat=REPEAT):
+    """Metrics of the synthetic app of `scale`, see `METRICS`"""
+
+    result = {}
+    with synthetic_app(**SCALES[scale]) as app, tempfile.TemporaryDirectory() as out:
+        apidoc = ApiDoc()
+        client = app.test_client()
+        runner = app.test_cli_runner()
+
+        with app.app_context():
+            result["apis"] = sum(
+                len(router["children"]) for router in apidoc._get_data_dict().values()
+            )
+            result["collect_s"] = best_time(apidoc._get_data_dict, repeat)
+            result["collect_peak_mb"] = peak_memory(apidoc._get_data_dict)
+
+        def get_data():
+            response = client.get("/docs/api/data")
+            assert response.status_code == 200, response.status
+            return response
+
+        def get_data_cold():
+            apidoc.invalidate(app)
+            get_data()
+
+        result["data_cold_ms"] = best_time(get_data_cold, repeat) * 1000
+        get_data()
+        seconds = []
+        for _ in range(repeat * 5):
+            start = time.perf_counter()
+            get_data()
+            seconds.append(time.perf_counter() - start)
+        result["data_warm_ms"] = statistics.median(seconds) * 1000
+
+        for command in ("html", "markdown"):
+
+            def export():
+                path = os.path.join(out, command)
+                invoked = runner.invoke(args=["docs", command, "-o", path, "-f"])
+                assert invoked.exit_code == 0, invoked.output
+
+            result[command + "_s"] = best_time(export, repeat)
+            result[command + "_peak_mb"] = peak_memory(export)
+
+    return result
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """The (scale, metric, baseline, result) more than `threshold` over baseline
+
+    Beyond the `NOISE` of the unit of the metric too.
+    """
+
+    regressions = []
+    for scale, result in results.items():
+        for metric in METRICS:
+            base = baseline.get(scale, {}).get(metric)
+            if base is None or metric not in result:
+                continue
+            noise = NOISE[metric.rsplit("_", 1)[-1]]
+            if result[metric] > max(base * (1 + threshold), base + noise):
+                regressions.append((scale, metric, base, result[metric]))
+
+    return regressions
+
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    baseline = load_baseline(path)
+    for scale, result in results.items():
+        baseline[scale] = {k: round(v, 3) for k, v in result.items()}
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=4, sort_keys=True)
+        f.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmark.suite")
+    parser.add_argument(
+        "scales",
+        nargs="*",
+        metavar="SCALE",
+        help="small, medium or large  [default: small medium]",
+    )
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="Save as the baseline")
+    args = parser.parse_args(argv)
+    for scale in args.scales:
+        if scale not in SCALES:
+            parser.error("unknown scale `{}`".format(scale))
+
+    baseline = load_baseline(args.baseline)
+    results = {}
+    print(
+        "{:>8} {:>18} {:>12} {:>12} {:>8}".format(
+            "scale", "metric", "baseline", "result", "ratio"
+        )
+    )
+    for scale in args.scales or ["small", "medium"]:
+        results[scale] = measure(scale, args.repeat)
+        print("{:>8} {:>18} {:>12}".format(scale, "apis", results[scale]["apis"]))
+        for metric in METRICS:
+            base = baseline.get(scale, {}).get(metric)
+            value = results[scale][metric]
+            print(
+                "{:>8} {:>18} {:>12} {:>12.3f} {:>8}".format(
+                    scale,
+                    metric,
+                    "-" if base is None else "{:.3f}".format(base),
+                    value,
+                    "-" if not base else "{:.2f}".format(value / base),
+                )
+            )
+
+    if args.save:
+        save_baseline(results, args.baseline)
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for scale, metric, base, value in regressions:
+        print(
+            "Regression: {} {} {:.3f} -> {:.3f}, over {:.0%}".format(
+                scale, metric, base, value, args.threshold
+            )
+        )
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
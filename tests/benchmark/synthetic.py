@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Program:
+    Synthetic apps for the benchmarks
+Version:
+    0.0.1
+History:
+    Created on 2026/10/17
+    Last modified on 2026/10/17
+Author:
+    kwkw
+"""
+
+import contextlib
+import importlib
+import os
+import sys
+import tempfile
+import textwrap
+
+from flask import Flask
+
+from flask_docs import SOURCE_INDEX, ApiDoc
+
+# The views are written to real modules, the arguments are parsed from the source
+HEADER = """\
+from flask import Blueprint
+from flask.views import MethodView
+from flask_restful import Api, Resource
+from flask_restful.reqparse import RequestParser
+from flask_restx import Api as RestxApi
+from flask_restx import Resource as RestxResource
+from flask_restx.reqparse import RequestParser as RestxRequestParser
+
+bp = Blueprint("bp{bp}", __name__)
+restful = Api(bp)
+restx_bp = Blueprint("restx{bp}", __name__)
+restx = RestxApi(restx_bp, doc=False, add_specs=False)
+"""
+
+DOC = '''\
+"""{title}
+
+@@@
+### return
+```json
+{{"code": 0, "data": "{title}"}}
+```
+@@@
+"""
+'''
+
+ARGUMENT = (
+    'parser.add_argument("arg{arg}", type=int, location="args",'
+    ' required=True, default={arg}, help="Argument {arg}")\n'
+)
+
+VIEW = """
+
+@bp.route("/view{view}", methods=["GET", "POST"])
+def view{view}():
+{doc}    parser = RequestParser()
+{arguments}    return ""
+"""
+
+METHOD_VIEW = '''
+
+class Bp{bp}MethodView{view}(MethodView):
+    """Method view {view} of bp{bp}"""
+
+    def get(self):
+{doc}        parser = RequestParser()
+{arguments}        return ""
+
+    def post(self):
+{doc}        return ""
+
+
+bp.add_url_rule(
+    "/method{view}", view_func=Bp{bp}MethodView{view}.as_view("method{view}")
+)
+'''
+
+RESOURCE = '''
+
+class Bp{bp}Resource{view}(Resource):
+    """Resource {view} of bp{bp}"""
+
+    def get(self):
+{doc}        parser = RequestParser()
+{arguments}        return ""
+
+    def delete(self):
+{doc}        return ""
+
+
+restful.add_resource(Bp{bp}Resource{view}, "/resource{view}")
+'''
+
+RESTX_RESOURCE = '''
+
+restx_parser{view} = RestxRequestParser()
+{restx_arguments}
+
+@restx.route("/restx{view}")
+class Bp{bp}RestxResource{view}(RestxResource):
+    """Restx resource {view} of bp{bp}"""
+
+    @restx.expect(restx_parser{view})
+    def get(self):
+{doc}        return ""
+'''
+
+RESTX_ARGUMENT = (
+    'restx_parser{view}.add_argument("arg{arg}", type=int, location="args",'
+    ' required=True, help="Argument {arg}")'
+)
+
+
+def make_module_source(
+    bp, views=0, method_views=0, resources=0, restx_resources=0, arguments=0
+):
+    """The source of a module with the views of one blueprint"""
+
+    def fields(view, kind):
+        # Function views are indented once, methods twice
+        indent = "    " if kind == "View" else "        "
+        title = "{} {} of bp{}".format(kind, view, bp)
+        return {
+            "bp": bp,
+            "view": view,
+            "doc": textwrap.indent(DOC.format(title=title), indent),
+            "arguments": textwrap.indent(
+                "".join(ARGUMENT.format(arg=arg) for arg in range(arguments)), indent
+            ),
+            "restx_arguments": "\n".join(
+                RESTX_ARGUMENT.format(view=view, arg=arg) for arg in range(arguments)
+            ),
+        }
+
+    source = [HEADER.format(bp=bp)]
+    source.extend(VIEW.format(**fields(i, "View")) for i in range(views))
+    source.extend(
+        METHOD_VIEW.format(**fields(i, "Method view")) for i in range(method_views)
+    )
+    source.extend(RESOURCE.format(**fields(i, "Resource")) for i in range(resources))
+    source.extend(
+        RESTX_RESOURCE.format(**fields(i, "Restx resource"))
+        for i in range(restx_resources)
+    )
+
+    return "".join(source)
+
+
+@contextlib.contextmanager
+def synthetic_app(blueprints=1, arguments=0, **sizes):
+    """An app with `blueprints` modules of views, see `make_module_source`
+
+    The modules are written to a temporary directory, removed on exit.
+    """
+
+    with tempfile.TemporaryDirectory() as root:
+        package = "synthetic_{}".format(os.path.basename(root).replace("-", "_"))
+        os.mkdir(os.path.join(root, package))
+        open(os.path.join(root, package, "__init__.py"), "w").close()
+        for bp in range(blueprints):
+            with open(os.path.join(root, package, "bp{}.py".format(bp)), "w") as f:
+                f.write(make_module_source(bp, arguments=arguments, **sizes))
+
+        app = Flask(__name__)
+        app.config["API_DOC_MEMBER"] = ["bp{}".format(bp) for bp in range(blueprints)]
+        app.config["API_DOC_RESTFUL_EXCLUDE"] = ["SwaggerView"]
+        app.config["API_DOC_AUTO_GENERATING_ARGS_MD"] = arguments > 0
+        ApiDoc(app, title="Synthetic App")
+
+        sys.path.insert(0, root)
+        try:
+            for bp in range(blueprints):
+                module = importlib.import_module("{}.bp{}".format(package, bp))
+                app.register_blueprint(module.bp, url_prefix="/bp{}".format(bp))
+                app.register_blueprint(
+                    module.restx_bp, url_prefix="/restx{}".format(bp)
+                )
+            yield app
+        finally:
+            sys.path.remove(root)
+            for name in [m for m in sys.modules if m.split(".")[0] == package]:
+                del sys.modules[name]
+            for path in [p for p in SOURCE_INDEX if p.startswith(root)]:
+                del SOURCE_INDEX[path]
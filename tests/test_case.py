@@ -13,8 +13,11 @@ Author:
     kwkw
 """
 
-
+import gzip
+import json
 import os
+import pathlib
+import re
 import sys
 
 sys.path.append(".")
@@ -30,7 +33,7 @@ from flask_restx import Api as RestxApi
 from flask_restx import Resource as RestxResource
 from flask_restx.reqparse import RequestParser as RestxRequestParser
 
-from flask_docs import ApiDoc
+from flask_docs import SOURCE_INDEX, ApiDoc
 
 app = Flask(__name__)
 app.config["API_DOC_METHODS_LIST"] = ["GET", "POST", "DELETE"]
@@ -163,6 +166,34 @@ class TodoListRestx(RestxResource):
 # Flask-Restx end
 
 
+def args_md_view():
+    """Parse args without add_argument(...) in the docstring"""
+
+    parser = RequestParser()
+    parser.add_argument("page", location="args", type=int, help="page (from 1)")
+    parser.add_argument("size", location=TodoList, type=int_range(1, 9), default=10)
+    parser.add_argument(name="key", help=__import__("os").remove("doc_never.md"))
+
+
+def stripped_doc_view():
+    """Docstring kept in the source"""
+
+
+stripped_doc_view.__doc__ = None
+
+
+def tricky_argument_view():
+    """Tricky add_argument(calls)"""
+
+    parser = RequestParser()
+    # parser.add_argument("commented", help="never parsed")
+    message = 'parser.add_argument("literal", help="never parsed")'
+    parser.add_argument("open", help="Open paren (")
+    parser.add_argument("close", help="Close paren ) here")
+    parser.add_argument("pair", help=")(").add_argument("chained", help="(x)")
+    return message
+
+
 class AcceptTestCase(unittest.TestCase):
     def test_accept_docs_api(self):
         with app.test_client() as client:
@@ -170,12 +201,163 @@ class AcceptTestCase(unittest.TestCase):
             self.assertEqual(res.status_code, 200)
             self.assertEqual(res.content_type, "text/html; charset=utf-8")
 
+    def test_lazy_scripts(self):
+        with app.test_client() as client:
+            html = client.get("/docs/api/").get_data(as_text=True)
+            self.assertIn('<script src="static/js/vue-2.6.14.min.js?v=', html)
+            self.assertNotIn('<script src="static/js/marked-3.0.7.min.js', html)
+            self.assertIn('"marked": "static/js/marked-3.0.7.min.js?v=', html)
+
+            res = client.get("/docs/api/static/js/marked-3.0.7.min.js")
+            self.assertEqual(res.status_code, 200)
+            res.close()
+
+    def test_static_fingerprint(self):
+        with app.test_client() as client:
+            html = client.get("/docs/api/").get_data(as_text=True)
+            url = re.search(r"static/js/vue-2\.6\.14\.min\.js\?v=\w+", html).group(0)
+
+            res = client.get("/docs/api/" + url)
+            self.assertEqual(res.status_code, 200)
+            self.assertTrue(res.cache_control.public)
+            self.assertTrue(res.cache_control.immutable)
+            self.assertEqual(res.cache_control.max_age, 31536000)
+            res.close()
+
+            res = client.get("/docs/api/static/js/vue-2.6.14.min.js?v=stale")
+            self.assertEqual(res.status_code, 200)
+            self.assertFalse(res.cache_control.immutable)
+            res.close()
+
     def test_accept_docs_api_data(self):
         with app.test_client() as client:
             res = client.get("/docs/api/data")
             self.assertEqual(res.status_code, 200)
             self.assertEqual(res.content_type, "application/json")
 
+            # Same bytes as `jsonify`
+            with app.test_request_context():
+                self.assertEqual(res.data, app.json.response(res.json).data)
+
+    def test_conditional_docs_api(self):
+        with app.test_client() as client:
+            res = client.get("/docs/api/")
+            self.assertIsNotNone(res.headers["ETag"])
+            self.assertIsNotNone(res.headers["Last-Modified"])
+
+            res_etag = client.get(
+                "/docs/api/", headers={"If-None-Match": res.headers["ETag"]}
+            )
+            self.assertEqual(res_etag.status_code, 304)
+            self.assertEqual(res_etag.data, b"")
+
+            res_modified = client.get(
+                "/docs/api/",
+                headers={"If-Modified-Since": res.headers["Last-Modified"]},
+            )
+            self.assertEqual(res_modified.status_code, 304)
+
+    def test_conditional_docs_api_data(self):
+        with app.test_client() as client:
+            res = client.get("/docs/api/data")
+            self.assertIn("Auth-Password-SHA2", res.headers["Vary"])
+
+            res_etag = client.get(
+                "/docs/api/data", headers={"If-None-Match": res.headers["ETag"]}
+            )
+            self.assertEqual(res_etag.status_code, 304)
+
+            res_host = client.get(
+                "/docs/api/data",
+                headers={
+                    "If-None-Match": res.headers["ETag"],
+                    "Referer": "http://example.com/docs/api/",
+                },
+            )
+            self.assertEqual(res_host.status_code, 200)
+            self.assertEqual(res_host.json["host"], "http://example.com")
+
+    def test_docs_api_data_index(self):
+        with app.test_client() as client:
+            res = client.get("/docs/api/data/index")
+            self.assertEqual(res.status_code, 200)
+            api = res.json["data"]["api"]["children"][0]
+            self.assertEqual(api["name"], "DeleteData")
+            self.assertNotIn("doc", api)
+            self.assertNotIn("doc_md", api)
+
+            res_etag = client.get(
+                "/docs/api/data/index", headers={"If-None-Match": res.headers["ETag"]}
+            )
+            self.assertEqual(res_etag.status_code, 304)
+
+    def test_docs_api_data_revision(self):
+        with app.test_client() as client:
+            res = client.get("/docs/api/data/revision")
+            self.assertEqual(res.status_code, 200)
+            revision = res.json["revision"]
+            self.assertEqual(res.headers["ETag"], '"{}"'.format(revision))
+            self.assertEqual(client.get("/docs/api/data").json["revision"], revision)
+            self.assertEqual(
+                client.get("/docs/api/data/index").json["revision"], revision
+            )
+
+            res_etag = client.get(
+                "/docs/api/data/revision",
+                headers={"If-None-Match": res.headers["ETag"]},
+            )
+            self.assertEqual(res_etag.status_code, 304)
+
+    def test_docs_api_data_detail(self):
+        with app.test_client() as client:
+            res = client.get(
+                "/docs/api/data/detail",
+                query_string={"router": "api", "name": "DeleteData"},
+            )
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.json["name"], "DeleteData")
+            self.assertIn("doc_md", res.json)
+
+            res_etag = client.get(
+                "/docs/api/data/detail",
+                query_string={"router": "api", "name": "DeleteData"},
+                headers={"If-None-Match": res.headers["ETag"]},
+            )
+            self.assertEqual(res_etag.status_code, 304)
+
+            res_not_found = client.get(
+                "/docs/api/data/detail", query_string={"router": "api", "name": "None"}
+            )
+            self.assertEqual(res_not_found.status_code, 404)
+
+    def test_docs_api_search(self):
+        with app.test_client() as client:
+            res = client.get("/docs/api/search", query_string={"q": "delete_data"})
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.json["q"], "delete_data")
+            self.assertEqual(res.json["results"][0]["name"], "DeleteData")
+            self.assertNotIn("doc_md", res.json["results"][0])
+
+            res = client.get("/docs/api/search", query_string={"q": "dele"})
+            self.assertEqual(res.json["results"][0]["name"], "DeleteData")
+
+            # Argument table and docstring of TodoList.post
+            for q in ["todo number", "Submission"]:
+                res = client.get("/docs/api/search", query_string={"q": q})
+                self.assertEqual(
+                    [(r["router"], r["name"]) for r in res.json["results"]],
+                    [("TodoList(Manage todolist)", "POST")],
+                )
+
+            res = client.get("/docs/api/search", query_string={"q": "delete nothing"})
+            self.assertEqual(res.json["results"], [])
+
+            res = client.get("/docs/api/search")
+            self.assertEqual(res.json["results"], [])
+
+            res = client.get("/docs/api/search", query_string={"q": "api", "limit": 1})
+            self.assertEqual(len(res.json["results"]), 1)
+
 
 class CoverageTestCase(unittest.TestCase):
     def test_api_route_coverage(self):
@@ -197,6 +379,93 @@ class CoverageTestCase(unittest.TestCase):
             self.assertEqual(res.status_code, 200)
             self.assertEqual(res.content_type, "application/json")
 
+    def test_auto_generating_args_md(self):
+        with app.app_context():
+            args_md = ApiDoc()._get_args_md(args_md_view)
+
+        self.assertEqual(
+            args_md.split("\n")[3:],
+            [
+                "|page|query|integer|False|True||page (from 1)|",
+                "|size|||False|True|10||",
+                "|key|||False|True|||",
+            ],
+        )
+
+    def test_change_doc(self):
+        def view():
+            """return_json, return_json_list and return"""
+
+        decorated_view = ApiDoc.change_doc(
+            {"return": "r", "return_json": "{}", "return_json_list": "[]"}
+        )(view)
+        self.assertIs(decorated_view, view)
+        self.assertEqual(view.__doc__, "{}, [] and r")
+
+        def no_doc_view():
+            pass
+
+        self.assertIsNone(ApiDoc.change_doc({"a": "b"})(no_doc_view).__doc__)
+        self.assertEqual(ApiDoc.change_doc({})(view).__doc__, "{}, [] and r")
+
+    def test_group_views(self):
+        with app.app_context():
+            restful_views, api_views = ApiDoc()._group_views()
+
+        self.assertEqual(len(restful_views[TodoList]), 1)
+        self.assertEqual(
+            sorted(str(rule) for rule in restful_views[TodoList][0][1]),
+            ["/todo", "/todolist"],
+        )
+        self.assertNotIn(TodoListExclude, restful_views)
+        self.assertEqual(list(api_views), ["api", "callback"])
+        self.assertEqual(
+            [func.__name__ for func, _ in api_views["api"]], ["delete_data"]
+        )
+
+    def test_source_index(self):
+        apidoc = ApiDoc()
+        with app.app_context():
+            apidoc._get_args_md(TodoList.post)
+            index = SOURCE_INDEX[os.path.abspath(__file__)]
+            self.assertIs(apidoc._get_source_index(os.path.abspath(__file__)), index)
+            self.assertEqual(len(index["functions"]["TodoList.post"]), 1)
+            entry = index["functions"]["TodoList.post"][0]
+            self.assertEqual(len(entry["arguments"]), 3)
+            self.assertNotIn("argument_nodes", entry)
+
+            self.assertEqual(
+                [
+                    (args["name"], args["help"])
+                    for args in apidoc._get_argument(tricky_argument_view)
+                ],
+                [
+                    ("open", "Open paren ("),
+                    ("close", "Close paren ) here"),
+                    ("pair", ")("),
+                    ("chained", "(x)"),
+                ],
+            )
+
+            # The source is read only when `python -OO` stripped the docstrings
+            self.assertEqual(apidoc._get_api_doc(stripped_doc_view), "")
+            self.assertEqual(
+                apidoc._get_source_doc(stripped_doc_view),
+                "Docstring kept in the source",
+            )
+
+    def test_source_index_without_arguments(self):
+        path = os.path.abspath(__file__)
+        SOURCE_INDEX.clear()
+        apidoc = ApiDoc()
+        apidoc._get_source_doc(stripped_doc_view)
+        entry = SOURCE_INDEX[path]["functions"]["tricky_argument_view"][0]
+        self.assertIsNone(entry["argument_nodes"])
+
+        # Parsed again when the arguments are needed
+        self.assertEqual(len(apidoc._get_argument(tricky_argument_view)), 4)
+        self.assertTrue(SOURCE_INDEX[path]["arguments"])
+
     def test_offline_html_doc(self):
         runner = app.test_cli_runner()
         result = runner.invoke(args=["docs", "html"])
@@ -247,6 +516,87 @@ class CoverageTestCase(unittest.TestCase):
 
         shutil.rmtree("htmldoc_exists2")
 
+    def test_offline_html_doc_incremental(self):
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=["docs", "html", "-o", "htmldoc_inc"])
+        assert result.exit_code == 0
+
+        with open("htmldoc_inc/manifest.json") as f:
+            manifest = json.load(f)
+        assert "index.html" in manifest
+        assert "data" in manifest
+        assert "static/js/vue-2.6.14.min.js" in manifest
+        stats = {name: os.stat("htmldoc_inc/" + name) for name in manifest}
+
+        os.remove("htmldoc_inc/data")
+        with open("htmldoc_inc/static/stale.js", "w") as f:
+            f.write("")
+        with open("htmldoc_inc/manifest.json") as f:
+            manifest_bytes = f.read()
+        with open("htmldoc_inc/manifest.json", "w") as f:
+            f.write(manifest_bytes.replace("{", '{"static/stale.js": "",', 1))
+
+        result = runner.invoke(args=["docs", "html", "-o", "htmldoc_inc", "-i"])
+        assert result.exit_code == 0
+
+        with open("htmldoc_inc/manifest.json") as f:
+            assert f.read() == manifest_bytes
+        assert not os.path.exists("htmldoc_inc/static/stale.js")
+        assert os.path.exists("htmldoc_inc/data")
+        for name, stat in stats.items():
+            if name != "data":
+                assert os.stat("htmldoc_inc/" + name).st_mtime_ns == stat.st_mtime_ns
+
+        result = runner.invoke(args=["docs", "html", "-o", "htmldoc_inc2"])
+        assert result.exit_code == 0
+        for name in manifest:
+            with open("htmldoc_inc/" + name, "rb") as a, open(
+                "htmldoc_inc2/" + name, "rb"
+            ) as b:
+                assert a.read() == b.read()
+
+        shutil.rmtree("htmldoc_inc")
+        shutil.rmtree("htmldoc_inc2")
+
+    def test_offline_html_doc_link(self):
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=["docs", "html", "-o", "htmldoc_link", "--link"])
+        assert result.exit_code == 0
+
+        for path in pathlib.Path(ApiDoc.APP_STATIC).rglob("*"):
+            if path.is_file():
+                target = (
+                    "htmldoc_link/static/"
+                    + path.relative_to(ApiDoc.APP_STATIC).as_posix()
+                )
+                assert os.path.samefile(path, target)
+
+        shutil.rmtree("htmldoc_link")
+
+    def test_offline_html_doc_shard(self):
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=["docs", "html", "-o", "htmldoc_whole"])
+        assert result.exit_code == 0
+        result = runner.invoke(args=["docs", "html", "-o", "htmldoc_shard", "--gzip"])
+        assert result.exit_code == 0
+
+        with open("htmldoc_whole/data") as f:
+            data_dict = json.load(f)["data"]
+        with open("htmldoc_shard/data") as f:
+            data = json.load(f)
+        assert list(data["shards"]) == list(data_dict)
+
+        for router, filename in data["shards"].items():
+            assert filename.endswith(".json.gz")
+            assert filename.startswith("shards/" + re.sub(r"[^\w.-]+", "_", router))
+            with gzip.open("htmldoc_shard/" + filename) as f:
+                assert json.load(f) == data_dict[router]
+            for api_data in data["data"][router]["children"]:
+                assert "doc_md" not in api_data
+
+        shutil.rmtree("htmldoc_whole")
+        shutil.rmtree("htmldoc_shard")
+
     def test_offline_markdown_doc(self):
         runner = app.test_cli_runner()
         result = runner.invoke(args=["docs", "markdown"])
@@ -292,6 +642,123 @@ class CoverageTestCase(unittest.TestCase):
 
         shutil.os.remove("doc_exists2.md")
 
+    def test_offline_markdown_doc_shard(self):
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=["docs", "markdown", "-o", "doc_whole.md"])
+        assert result.exit_code == 0
+
+        result = runner.invoke(args=["docs", "markdown", "--shard"])
+        assert result.exit_code == 0
+        filenames = sorted(os.listdir("mddoc"))
+        assert filenames[-1] == "index.md"
+        with open("mddoc/index.md") as f:
+            index = f.read()
+
+        md = ""
+        for filename in filenames[:-1]:
+            assert "(" + filename + ")" in index
+            with open("mddoc/" + filename) as f:
+                md += f.read()
+        with open("doc_whole.md") as f:
+            assert f.read() == md
+
+        result = runner.invoke(args=["docs", "markdown", "-s"])
+        assert result.exit_code == 1
+        result = runner.invoke(args=["docs", "markdown", "-s", "-f"])
+        assert result.exit_code == 0
+
+        shutil.os.remove("doc_whole.md")
+        shutil.rmtree("mddoc")
+
+    def test_offline_markdown_doc_jobs(self):
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=["docs", "markdown", "-o", "doc_serial.md"])
+        assert result.exit_code == 0
+
+        SOURCE_INDEX.clear()
+        result = runner.invoke(
+            args=["docs", "markdown", "-o", "doc_jobs.md", "-j", "2"]
+        )
+        assert result.exit_code == 0
+        assert os.path.abspath(__file__) in SOURCE_INDEX
+        for entries in SOURCE_INDEX[os.path.abspath(__file__)]["functions"].values():
+            assert all("argument_nodes" not in entry for entry in entries)
+
+        with open("doc_serial.md") as serial, open("doc_jobs.md") as jobs:
+            assert serial.read() == jobs.read()
+
+        shutil.os.remove("doc_serial.md")
+        shutil.os.remove("doc_jobs.md")
+
+    def test_warm_source_index_without_args_md(self):
+        SOURCE_INDEX.clear()
+        app.config["API_DOC_AUTO_GENERATING_ARGS_MD"] = False
+        try:
+            with app.app_context():
+                ApiDoc()._warm_source_index(2)
+        finally:
+            app.config["API_DOC_AUTO_GENERATING_ARGS_MD"] = True
+
+        self.assertEqual(SOURCE_INDEX, {})
+
+
+class CacheTestCase(unittest.TestCase):
+    def test_data_cache_invalidation(self):
+        cache_app = Flask(__name__)
+        cache_app.config["API_DOC_MEMBER"] = ["api"]
+        apidoc = ApiDoc(cache_app, title="Cache App")
+
+        cache_api = Blueprint("api", __name__)
+
+        @cache_api.route("/first")
+        def first():
+            """First api"""
+
+        cache_app.register_blueprint(cache_api)
+
+        with cache_app.app_context():
+            data_cache = apidoc._get_data_cache()
+            self.assertIs(data_cache, apidoc._get_data_cache())
+            self.assertEqual(len(data_cache["data_dict"]["api"]["children"]), 1)
+
+            @cache_app.route("/second")
+            def second():
+                pass
+
+            cache_app.view_functions["api.first"] = second
+            data_cache = apidoc._get_data_cache()
+            self.assertEqual(
+                data_cache["data_dict"]["api"]["children"][0]["name"], "Second"
+            )
+
+            apidoc.invalidate()
+            self.assertIsNot(data_cache, apidoc._get_data_cache())
+
+        with cache_app.test_client() as client:
+            res = client.get("/docs/api/data")
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.json["title"], "Cache App")
+            self.assertIn("api", res.json["data"])
+
+    def test_html_cache(self):
+        cache_app = Flask(__name__)
+        apidoc = ApiDoc(cache_app)
+
+        with cache_app.app_context():
+            html = apidoc._get_html()
+            self.assertIs(html, apidoc._get_html())
+            self.assertEqual(html["body"], apidoc._render_html().encode())
+
+            cache_app.config["API_DOC_CDN"] = True
+            cdn_html = apidoc._get_html()
+            self.assertIn(b"cdn.staticfile.net", cdn_html["body"])
+            self.assertNotEqual(html["etag"], cdn_html["etag"])
+
+        with cache_app.test_client() as client:
+            res = client.get("/docs/api/")
+            self.assertEqual(res.data, cdn_html["body"])
+            self.assertEqual(res.headers["ETag"], '"{}"'.format(cdn_html["etag"]))
+
 
 if __name__ == "__main__":
     unittest.main()
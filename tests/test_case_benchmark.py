@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Program:
+    Test case benchmark
+Version:
+    0.0.1
+History:
+    Created on 2026/10/17
+    Last modified on 2026/10/17
+Author:
+    kwkw
+"""
+
+import sys
+
+sys.path.append(".")
+
+import unittest
+
+from flask_docs import ApiDoc
+from tests.benchmark.suite import METRICS, compare, measure
+from tests.benchmark.synthetic import synthetic_app
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    def test_synthetic_app(self):
+        with synthetic_app(
+            blueprints=2,
+            views=3,
+            method_views=1,
+            resources=1,
+            restx_resources=1,
+            arguments=2,
+        ) as app:
+            with app.app_context():
+                data_dict = ApiDoc()._get_data_dict()
+
+        self.assertEqual(len(data_dict["bp0"]["children"]), 3)
+        self.assertIn("Bp1MethodView0(Method view 0 of bp1)", data_dict)
+        self.assertIn("Bp1Resource0(Resource 0 of bp1)", data_dict)
+        restx = data_dict["Bp1RestxResource0(Restx resource 0 of bp1)"]["children"]
+        self.assertEqual([api["name"] for api in restx], ["GET"])
+        self.assertEqual(restx[0]["doc_md"].count("|arg"), 2)
+        self.assertEqual(data_dict["bp1"]["children"][0]["doc_md"].count("|arg"), 2)
+
+    def test_measure(self):
+        result = measure("small", repeat=1)
+
+        self.assertEqual(result["apis"], 40)
+        for metric in METRICS:
+            self.assertGreater(result[metric], 0)
+
+    def test_compare(self):
+        baseline = {"small": {"collect_s": 1.0, "data_warm_ms": 0.5}}
+        results = {"small": {"collect_s": 1.6, "data_warm_ms": 1.2}}
+
+        self.assertEqual(
+            compare(results, baseline, threshold=0.5),
+            [("small", "collect_s", 1.0, 1.6)],
+        )
+        self.assertEqual(compare(results, baseline, threshold=1), [])
+        self.assertEqual(compare(results, {}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Program:
+    Test case compress
+Version:
+    0.0.1
+History:
+    Created on 2026/10/17
+    Last modified on 2026/10/17
+Author:
+    kwkw
+"""
+
+import sys
+
+sys.path.append(".")
+
+import gzip
+import os
+import unittest
+import zlib
+from collections import OrderedDict
+
+from flask import Blueprint, Flask
+
+from flask_docs import ApiDoc
+
+app = Flask(__name__)
+app.config["API_DOC_COMPRESS"] = True
+app.config["API_DOC_MEMBER"] = ["api"]
+ApiDoc(app, title="Test App")
+
+api = Blueprint("api", __name__)
+
+
+@api.route("/add_data", methods=["POST"])
+def add_data():
+    """Add some data"""
+
+
+app.register_blueprint(api, url_prefix="/api")
+
+VUE_JS = os.path.join(ApiDoc.APP_STATIC, "js", "vue-2.6.14.min.js")
+
+
+def gunzip(data):
+    """Decompress a single gzip stream, as browsers and curl do"""
+
+    decompressor = zlib.decompressobj(31)
+    body = decompressor.decompress(data)
+    assert decompressor.eof and decompressor.unused_data == b"", "not one stream"
+    return body
+
+
+class CompressTestCase(unittest.TestCase):
+    def test_static_gzip(self):
+        with app.test_client() as client:
+            res = client.get(
+                "/docs/api/static/js/vue-2.6.14.min.js",
+                headers={"Accept-Encoding": "gzip"},
+            )
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.headers["Content-Encoding"], "gzip")
+            self.assertIn("Accept-Encoding", res.headers["Vary"])
+            with open(VUE_JS, "rb") as f:
+                self.assertEqual(gzip.decompress(res.data), f.read())
+
+            res_etag = client.get(
+                "/docs/api/static/js/vue-2.6.14.min.js",
+                headers={
+                    "Accept-Encoding": "gzip",
+                    "If-None-Match": res.headers["ETag"],
+                },
+            )
+            self.assertEqual(res_etag.status_code, 304)
+
+    def test_static_identity(self):
+        with app.test_client() as client:
+            res = client.get("/docs/api/static/js/vue-2.6.14.min.js")
+            self.assertEqual(res.status_code, 200)
+            self.assertNotIn("Content-Encoding", res.headers)
+            self.assertIn("Accept-Encoding", res.headers["Vary"])
+
+            res = client.get(
+                "/docs/api/static/icon/../../__init__.py",
+                headers={"Accept-Encoding": "gzip"},
+            )
+            self.assertEqual(res.status_code, 404)
+
+    def test_data_gzip(self):
+        with app.test_client() as client:
+            res = client.get("/docs/api/data", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.headers["Content-Encoding"], "gzip")
+            self.assertIn(b"AddData", gunzip(res.data))
+
+            res_plain = client.get("/docs/api/data")
+            self.assertNotIn("Content-Encoding", res_plain.headers)
+            self.assertNotEqual(res.headers["ETag"], res_plain.headers["ETag"])
+            self.assertEqual(gunzip(res.data), res_plain.data)
+
+            res_index = client.get(
+                "/docs/api/data/index", headers={"Accept-Encoding": "gzip"}
+            )
+            self.assertEqual(
+                gunzip(res_index.data), client.get("/docs/api/data/index").data
+            )
+
+    def test_data_gzip_referer(self):
+        with app.test_client() as client:
+            for i in range(ApiDoc.COMPRESS_CACHE_SIZE + 1):
+                headers = {
+                    "Accept-Encoding": "gzip, br",
+                    "Referer": "http://host{}/docs/api/".format(i),
+                }
+                res = client.get("/docs/api/data", headers=headers)
+                self.assertEqual(res.headers["Content-Encoding"], "gzip")
+                self.assertEqual(
+                    gunzip(res.data),
+                    client.get(
+                        "/docs/api/data", headers={"Referer": headers["Referer"]}
+                    ).data,
+                )
+
+        # The docs are compressed once whatever the head
+        data_cache = app.extensions["api_doc"]["data_cache"]
+        self.assertEqual(
+            [
+                key
+                for key in data_cache["compressed"]
+                if key[0] == data_cache["data_hash"]
+            ],
+            [(data_cache["data_hash"], "deflate", False)],
+        )
+
+    def test_detail_gzip(self):
+        with app.test_client() as client:
+            client.get("/docs/api/data", headers={"Accept-Encoding": "gzip"})
+            res = client.get(
+                "/docs/api/data/detail",
+                query_string={"router": "api", "name": "AddData"},
+                headers={"Accept-Encoding": "gzip"},
+            )
+            self.assertEqual(res.headers["Content-Encoding"], "gzip")
+            self.assertIn(b"AddData", gunzip(res.data))
+
+        # The details are cached apart from the docs
+        data_cache = app.extensions["api_doc"]["data_cache"]
+        self.assertEqual(len(data_cache["detail_compressed"]), 1)
+        self.assertTrue(
+            all(
+                key[0] in (data_cache["data_hash"], data_cache["index_hash"])
+                for key in data_cache["compressed"]
+            )
+        )
+
+    def test_static_cache_apart(self):
+        state = app.extensions["api_doc"]
+        api_doc = ApiDoc()
+        with app.test_client() as client:
+            client.get(
+                "/docs/api/static/js/vue-2.6.14.min.js",
+                headers={"Accept-Encoding": "gzip"},
+            )
+            for i in range(ApiDoc.COMPRESS_CACHE_SIZE + 1):
+                with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+                    response = app.response_class(b"body")
+                    api_doc._compress_response(response, str(i), state["compressed"])
+
+        self.assertIn((VUE_JS, "gzip"), state["static_compressed"])
+        self.assertNotIn((VUE_JS, "gzip"), state["compressed"])
+
+    def test_compressed_cache_lru(self):
+        compressed = OrderedDict()
+        api_doc = ApiDoc()
+        for i in range(ApiDoc.COMPRESS_CACHE_SIZE):
+            api_doc._get_compressed(compressed, i, lambda: b"data")
+        api_doc._get_compressed(compressed, 0, lambda: b"data")
+        api_doc._get_compressed(compressed, "new", lambda: b"data")
+
+        self.assertEqual(len(compressed), ApiDoc.COMPRESS_CACHE_SIZE)
+        self.assertNotIn(1, compressed)
+        self.assertIn(0, compressed)
+        self.assertEqual(list(compressed)[-1], "new")
+
+    @unittest.skipIf(ApiDoc()._get_brotli() is None, "brotli is not installed")
+    def test_static_brotli(self):
+        with app.test_client() as client:
+            res = client.get(
+                "/docs/api/static/js/vue-2.6.14.min.js",
+                headers={"Accept-Encoding": "gzip, br"},
+            )
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.headers["Content-Encoding"], "br")
+
+    def test_index_gzip(self):
+        with app.test_client() as client:
+            res = client.get("/docs/api/", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.headers["Content-Encoding"], "gzip")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,7 +13,6 @@ Author:
     kwkw
 """
 
-
 import sys
 
 sys.path.append(".")
@@ -60,6 +59,43 @@ class CoverageTestCase(unittest.TestCase):
             self.assertEqual(res.status_code, 200)
             self.assertEqual(res.content_type, "application/json")
 
+    def test_api_conditional_with_password(self):
+        headers = {
+            "Auth-Password-SHA2": "8c6976e5b5410415bde908bd4dee15dfb167a9c873fc4bb8a81f6f2ab448a918"
+        }
+        with app.test_client() as client:
+            res = client.get("/docs/api/data", headers=headers)
+            self.assertIn("Auth-Password-SHA2", res.headers["Vary"])
+            self.assertIn("private", res.headers["Cache-Control"])
+
+            res_etag = client.get(
+                "/docs/api/data",
+                headers=dict(headers, **{"If-None-Match": res.headers["ETag"]}),
+            )
+            self.assertEqual(res_etag.status_code, 304)
+
+            res_unauthorized = client.get(
+                "/docs/api/data", headers={"If-None-Match": res.headers["ETag"]}
+            )
+            self.assertEqual(res_unauthorized.status_code, 401)
+            self.assertIn("Auth-Password-SHA2", res_unauthorized.headers["Vary"])
+
+    def test_api_detail_with_password(self):
+        with app.test_client() as client:
+            res = client.get("/docs/api/data/index")
+            self.assertEqual(res.status_code, 401)
+
+            res = client.get(
+                "/docs/api/data/detail", query_string={"router": "api", "name": "None"}
+            )
+            self.assertEqual(res.status_code, 401)
+
+            res = client.get("/docs/api/search", query_string={"q": "api"})
+            self.assertEqual(res.status_code, 401)
+
+            res = client.get("/docs/api/data/revision")
+            self.assertEqual(res.status_code, 401)
+
 
 if __name__ == "__main__":
     unittest.main()
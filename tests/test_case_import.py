@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Program:
+    Test case import
+Version:
+    0.0.1
+History:
+    Created on 2026/10/17
+    Last modified on 2026/10/17
+Author:
+    kwkw
+"""
+
+import sys
+
+sys.path.append(".")
+
+import subprocess
+import unittest
+
+
+class ImportTestCase(unittest.TestCase):
+    def test_lazy_class_attributes(self):
+        code = (
+            "import flask_docs\n"
+            "attrs = vars(flask_docs.ApiDoc)\n"
+            "print(type(attrs['INDEX_HTML']).__name__)\n"
+            "print(type(attrs['SEARCH_TOKEN']).__name__)\n"
+            "flask_docs.ApiDoc.INDEX_HTML\n"
+            "print(type(attrs['INDEX_HTML']).__name__)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.split(), ["_Template", "_Pattern", "str"])
+
+
+if __name__ == "__main__":
+    unittest.main()
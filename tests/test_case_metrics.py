@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Program:
+    Test case metrics
+Version:
+    0.0.1
+History:
+    Created on 2026/10/17
+    Last modified on 2026/10/17
+Author:
+    kwkw
+"""
+
+import sys
+
+sys.path.append(".")
+
+import unittest
+
+from flask import Blueprint, Flask
+
+from flask_docs import ApiDoc
+
+PASSWORD_SHA2 = "8c6976e5b5410415bde908bd4dee15dfb167a9c873fc4bb8a81f6f2ab448a918"
+HEADERS = {"Auth-Password-SHA2": PASSWORD_SHA2}
+
+events = []
+
+app = Flask(__name__)
+app.config["API_DOC_METRICS"] = True
+app.config["API_DOC_METRICS_CALLBACK"] = lambda *event: events.append(event)
+app.config["API_DOC_PASSWORD_SHA2"] = PASSWORD_SHA2
+app.config["API_DOC_MEMBER"] = ["api"]
+api_doc = ApiDoc(app, title="Test App")
+
+api = Blueprint("api", __name__)
+
+
+@api.route("/get_data", methods=["GET"])
+def get_data():
+    """Get some data"""
+
+
+app.register_blueprint(api, url_prefix="/api")
+
+
+class MetricsTestCase(unittest.TestCase):
+    def test_metrics(self):
+        metrics = app.extensions["api_doc"]["metrics"]
+        with app.test_client() as client:
+            api_doc.invalidate(app)
+            self.assertEqual(client.get("/docs/api/data").status_code, 401)
+            res = client.get("/docs/api/data", headers=HEADERS)
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(
+                client.get("/docs/api/data", headers=HEADERS).status_code, 200
+            )
+
+            res = client.get("/docs/api/metrics", headers=HEADERS)
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(
+                res.content_type, "text/plain; version=0.0.4; charset=utf-8"
+            )
+            text = res.get_data(as_text=True)
+
+        self.assertIn('flask_docs_requests_total{status="200",view="data"} 2\n', text)
+        self.assertIn('flask_docs_requests_total{status="401",view="data"} 1\n', text)
+        self.assertIn('flask_docs_unauthorized_total{view="data"} 1\n', text)
+        self.assertIn("flask_docs_collection_seconds_count 1\n", text)
+        self.assertIn('flask_docs_payload_bytes_count{view="data"} 2\n', text)
+        self.assertIn("flask_docs_cache_hit_ratio 0.5\n", text)
+
+        self.assertEqual(metrics.get("flask_docs_cache_misses_total"), 1)
+        self.assertEqual(metrics.get("flask_docs_requests_total"), 4)
+        self.assertIn(("flask_docs_unauthorized_total", 1, {"view": "data"}), events)
+
+    def test_metrics_callback_fail(self):
+        fail_app = Flask(__name__)
+        fail_app.config["API_DOC_METRICS_CALLBACK"] = "callback"
+        with self.assertRaises(ValueError):
+            ApiDoc(fail_app)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Program:
+    Test case profile
+Version:
+    0.0.1
+History:
+    Created on 2026/10/17
+    Last modified on 2026/10/17
+Author:
+    kwkw
+"""
+
+import sys
+
+sys.path.append(".")
+
+import json
+import tracemalloc
+import unittest
+
+from flask import Blueprint, Flask
+from flask_restful.reqparse import RequestParser
+
+from flask_docs import SOURCE_INDEX, ApiDoc
+
+app = Flask(__name__)
+app.config["API_DOC_PROFILE"] = True
+app.config["API_DOC_AUTO_GENERATING_ARGS_MD"] = True
+app.config["API_DOC_MEMBER"] = ["api"]
+api_doc = ApiDoc(app, title="Test App")
+
+api = Blueprint("api", __name__)
+
+
+@api.route("/add_data", methods=["POST"])
+def add_data():
+    """Add some data"""
+
+    parser = RequestParser()
+    parser.add_argument("name", type=str, location="json", help="data name")
+
+
+@api.route("/get_data", methods=["GET"])
+def get_data():
+    """Get some data"""
+
+
+app.register_blueprint(api, url_prefix="/api")
+
+
+class ProfileTestCase(unittest.TestCase):
+    def test_profile_hook(self):
+        with app.test_client() as client:
+            SOURCE_INDEX.clear()
+            api_doc.invalidate(app)
+            res = client.get("/docs/api/data")
+            self.assertEqual(res.status_code, 200)
+
+        report = app.extensions["api_doc"]["profile"]
+        phases = {row["phase"]: row for row in report["phases"]}
+        self.assertEqual(phases["rules"]["calls"], 1)
+        self.assertEqual(phases["args_parse"]["calls"], 1)
+        self.assertEqual(phases["json"]["calls"], 1)
+        self.assertIsNone(report["peak_mb"])
+        self.assertEqual(
+            sorted(row["endpoint"] for row in report["endpoints"]),
+            ["GET /api/get_data", "POST /api/add_data"],
+        )
+
+        # The instance of the app is not instrumented
+        self.assertNotIn("_get_args_md", vars(api_doc))
+
+    def test_profile_command(self):
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=["docs", "profile", "-n", "1"])
+        self.assertEqual(result.exit_code, 0)
+        lines = result.output.splitlines()
+        self.assertEqual(lines[0].split()[0], "phase")
+        self.assertIn("total", [line.split()[0] for line in lines if line])
+        self.assertEqual(lines[-2].split()[0], "endpoint")
+
+    def test_profile_command_json(self):
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=["docs", "profile", "--json"])
+        self.assertEqual(result.exit_code, 0)
+        report = json.loads(result.output)
+        self.assertAlmostEqual(sum(row["percent"] for row in report["phases"]), 100)
+        self.assertAlmostEqual(
+            sum(row["seconds"] for row in report["phases"]), report["seconds"]
+        )
+        self.assertGreater(report["peak_mb"], 0)
+        self.assertEqual(len(report["endpoints"]), 2)
+
+    def test_profile_command_traced(self):
+        tracemalloc.start()
+        try:
+            runner = app.test_cli_runner()
+            result = runner.invoke(args=["docs", "profile", "--json"])
+            self.assertEqual(result.exit_code, 0)
+            # The tracing of the process is left alone
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+
+        self.assertIsNone(json.loads(result.output)["peak_mb"])
+
+
+if __name__ == "__main__":
+    unittest.main()
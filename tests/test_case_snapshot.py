@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Program:
+    Test case snapshot
+Version:
+    0.0.1
+History:
+    Created on 2026/10/17
+    Last modified on 2026/10/17
+Author:
+    kwkw
+"""
+
+import sys
+
+sys.path.append(".")
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from flask import Blueprint, Flask
+
+from flask_docs import ApiDoc
+
+snapshot_dir = tempfile.mkdtemp()
+snapshot_path = os.path.join(snapshot_dir, "apidoc.json")
+
+app = Flask(__name__)
+app.config["API_DOC_MEMBER"] = ["api"]
+app.config["API_DOC_SNAPSHOT_PATH"] = snapshot_path
+apidoc = ApiDoc(app, title="Test App")
+
+api = Blueprint("api", __name__)
+
+
+@api.route("/add_data", methods=["POST"])
+def add_data():
+    """Add some data"""
+
+
+app.register_blueprint(api, url_prefix="/api")
+
+
+class SnapshotTestCase(unittest.TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(snapshot_dir)
+
+    def tearDown(self):
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+        apidoc.invalidate(app)
+
+    def test_snapshot_missing(self):
+        with app.test_client() as client:
+            res = client.get("/docs/api/data")
+            self.assertEqual(res.status_code, 200)
+            self.assertIn("api", res.json["data"])
+
+    def test_snapshot_build(self):
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=["docs", "build"])
+        assert result.exit_code == 0
+
+        with open(snapshot_path) as f:
+            snapshot = json.load(f)
+        self.assertEqual(snapshot["format"], ApiDoc.SNAPSHOT_FORMAT)
+        self.assertIn("api", snapshot["data"])
+
+        result = runner.invoke(args=["docs", "build"])
+        assert result.exit_code == 1
+
+        result = runner.invoke(args=["docs", "build", "-f"])
+        assert result.exit_code == 0
+
+    def test_snapshot_serve(self):
+        with open(snapshot_path, "w") as f:
+            json.dump(
+                {
+                    "format": ApiDoc.SNAPSHOT_FORMAT,
+                    "data": {"snapshot": {"children": []}},
+                },
+                f,
+            )
+        apidoc.invalidate(app)
+
+        with app.test_client() as client:
+            res = client.get("/docs/api/data")
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.json["data"], {"snapshot": {"children": []}})
+
+    def test_snapshot_format_mismatch(self):
+        with open(snapshot_path, "w") as f:
+            json.dump({"format": 0, "data": {"snapshot": {"children": []}}}, f)
+        apidoc.invalidate(app)
+
+        with app.test_client() as client:
+            res = client.get("/docs/api/data")
+            self.assertEqual(res.status_code, 200)
+            self.assertIn("api", res.json["data"])
+
+    def test_snapshot_shape_mismatch(self):
+        for snapshot in (
+            [],
+            {"format": ApiDoc.SNAPSHOT_FORMAT},
+            {"format": ApiDoc.SNAPSHOT_FORMAT, "data": []},
+            {"format": ApiDoc.SNAPSHOT_FORMAT, "data": {"snapshot": {}}},
+            {"format": ApiDoc.SNAPSHOT_FORMAT, "data": {"snapshot": {"children": [1]}}},
+        ):
+            with open(snapshot_path, "w") as f:
+                json.dump(snapshot, f)
+            with self.assertLogs("flask_docs", "WARNING"):
+                apidoc.invalidate(app)
+
+            with app.test_client() as client:
+                res = client.get("/docs/api/data")
+                self.assertEqual(res.status_code, 200)
+                self.assertIn("api", res.json["data"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Program:
+    Test case stream
+Version:
+    0.0.1
+History:
+    Created on 2026/10/17
+    Last modified on 2026/10/17
+Author:
+    kwkw
+"""
+
+import sys
+
+sys.path.append(".")
+
+import gzip
+import json
+import unittest
+
+from flask import Blueprint, Flask
+
+from flask_docs import ApiDoc
+
+app = Flask(__name__)
+app.config["API_DOC_STREAM"] = True
+app.config["API_DOC_COMPRESS"] = True
+app.config["API_DOC_MEMBER"] = ["api", "platform"]
+api_doc = ApiDoc(app, title="Test App")
+
+api = Blueprint("api", __name__)
+platform = Blueprint("platform", __name__)
+
+
+@api.route("/add_data", methods=["POST"])
+def add_data():
+    """Add some data"""
+
+
+@api.route("/get_data", methods=["GET"])
+def get_data():
+    """Get some data"""
+
+
+@platform.route("/get_user", methods=["GET"])
+def get_user():
+    """Get some user"""
+
+
+app.register_blueprint(api, url_prefix="/api")
+app.register_blueprint(platform, url_prefix="/platform")
+
+
+class StreamTestCase(unittest.TestCase):
+    def test_stream_docs_api_data(self):
+        with app.test_client() as client:
+            res = client.get("/docs/api/data")
+            self.assertEqual(res.status_code, 200)
+            self.assertTrue(res.is_streamed)
+            self.assertEqual(res.content_type, "application/json")
+            self.assertEqual(list(res.json["data"]), ["api", "platform"])
+            self.assertEqual(res.json["title"], "Test App")
+
+            res_etag = client.get(
+                "/docs/api/data", headers={"If-None-Match": res.headers["ETag"]}
+            )
+            self.assertEqual(res_etag.status_code, 304)
+            self.assertEqual(res_etag.data, b"")
+
+    def test_stream_docs_api_data_gzip(self):
+        with app.test_client() as client:
+            res = client.get("/docs/api/data", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.headers["Content-Encoding"], "gzip")
+            self.assertIn("Accept-Encoding", res.headers["Vary"])
+            self.assertEqual(
+                json.loads(gzip.decompress(res.data)),
+                client.get("/docs/api/data").json,
+            )
+
+    def test_stream_same_as_json(self):
+        with app.app_context():
+            data_dict = api_doc._get_data_dict()
+            self.assertEqual(
+                b"".join(api_doc._iter_data_json(data_dict)),
+                api_doc._dumps(data_dict).encode(),
+            )
+            self.assertEqual(b"".join(api_doc._iter_data_json({})), b"{}")
+
+
+if __name__ == "__main__":
+    unittest.main()